@@ -1,10 +1,27 @@
-from flask import Flask
-from flask_cors import CORS
+import os
+import orjson
+from quart import Quart
+from quart.json.provider import DefaultJSONProvider
+from quart_cors import cors
 from app.services.debug_logger import DebugLogger
+from app.services.job_cache import JobCache
 from app.config import Config
 
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson for faster jsonify/get_json"""
+    
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get('indent'):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 def create_app():
-    app = Flask(__name__)
+    app = Quart(__name__)
+    app.json = OrjsonProvider(app)
     
     # Load configuration
     app.config.from_object(Config)
@@ -16,13 +33,21 @@ def create_app():
     # Validate configuration
     Config.validate_config()
     
+    # Ensure upload directory exists once at startup
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    
     # Initialize CORS
-    CORS(app)
+    app = cors(app)
+    
+    # Initialize in-memory state (bounded, least recently used jobs are evicted)
+    cache_size = app.config['ANALYSIS_CACHE_SIZE']
+    app.document_queue = JobCache(maxsize=cache_size)
+    app.processing_status = JobCache(maxsize=cache_size)
+    app.analysis_results = JobCache(maxsize=cache_size)
     
-    # Initialize in-memory state
-    app.document_queue = {}
-    app.processing_status = {}
-    app.analysis_results = {}
+    # Shared event manager (stateless, reads and writes the caches above)
+    from app.services.event_manager import EventManager
+    app.extensions['event_manager'] = EventManager(app)
     
     # Register blueprints
     from app.routes import upload, analysis, status, api
@@ -31,9 +56,25 @@ def create_app():
     app.register_blueprint(status.bp)
     app.register_blueprint(api.bp)
     
+    # Shared document processor (spaCy model is loaded once per process)
+    from app.services.document_processor import DocumentProcessor
+    app.extensions['doc_processor'] = DocumentProcessor(app)
+    
+    # Shared Dify client (aiohttp session is created lazily on the serving loop)
+    from app.services.dify_service import DifyService
+    app.extensions['dify_service'] = DifyService(app)
+    
+    @app.after_serving
+    async def close_dify_session():
+        await app.extensions['dify_service'].close()
+    
+    @app.after_serving
+    async def shutdown_event_manager():
+        app.extensions['event_manager'].shutdown()
+    
     # Log successful initialization
     DebugLogger.log_info("Application initialized successfully")
-    DebugLogger.log_system_health("Flask App", "Running", {
+    DebugLogger.log_system_health("Quart App", "Running", {
         "debug_mode": app.debug,
         "log_level": log_level,
         "upload_folder": app.config.get('UPLOAD_FOLDER'),
@@ -10,6 +10,7 @@ class Config:
     # API settings
     DIFY_API_KEY = os.environ.get('DIFY_API_KEY')
     DIFY_API_URL = os.environ.get('DIFY_API_URL', 'https://api.dify.ai/v1')
+    DIFY_CONCURRENCY = int(os.environ.get('DIFY_CONCURRENCY', 8))
     
     # Logging
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
@@ -18,6 +19,11 @@ class Config:
     MAX_PARAGRAPHS = 1000
     MAX_WORDS_PER_PARAGRAPH = 1000
     PROCESSING_TIMEOUT = 300
+    PROCESSING_WORKERS = int(os.environ.get('PROCESSING_WORKERS', min(8, os.cpu_count() or 1)))
+    
+    # In-memory job state
+    ANALYSIS_CACHE_SIZE = int(os.environ.get('ANALYSIS_CACHE_SIZE', 512))
+    PARAGRAPH_CACHE_SIZE = int(os.environ.get('PARAGRAPH_CACHE_SIZE', 2048))
     
     @classmethod
     def validate_config(cls):
@@ -1,8 +1,8 @@
-from flask import Blueprint, render_template
+from quart import Blueprint, render_template
 
 bp = Blueprint('analysis', __name__)
 
 @bp.route('/')
-def index():
+async def index():
     """Main page for document analysis"""
-    return render_template('index.html') 
\ No newline at end of file
+    return await render_template('index.html') 
\ No newline at end of file
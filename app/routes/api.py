@@ -1,14 +1,15 @@
-from flask import Blueprint, request, jsonify, current_app
+from quart import Blueprint, request, jsonify, current_app
+from quart.utils import run_sync
 from app.services.debug_logger import DebugLogger
-from datetime import datetime
+import time
 
 bp = Blueprint('api', __name__)
 
 @bp.route('/api/update-paragraph', methods=['POST'])
-def update_paragraph():
+async def update_paragraph():
     """Update paragraph content in real-time"""
     
-    start_time = datetime.now()
+    start_time = time.perf_counter()
     
     try:
         # Log request
@@ -20,7 +21,7 @@ def update_paragraph():
             user_agent=request.headers.get('User-Agent')
         )
         
-        data = request.get_json()
+        data = await request.get_json()
         if not data:
             DebugLogger.log_warning("Invalid JSON data in paragraph update", {
                 "ip": request.remote_addr,
@@ -58,7 +59,7 @@ def update_paragraph():
             DebugLogger.log_warning("Analysis results not found for paragraph update", {
                 "ip": request.remote_addr,
                 "job_id": job_id,
-                "available_jobs": list(current_app.analysis_results.keys())
+                "cached_jobs": len(current_app.analysis_results)
             })
             return jsonify({'error': 'Analysis results not found'}), 404
         
@@ -68,12 +69,11 @@ def update_paragraph():
             results['paragraph_analyses'][paragraph_id]['text'] = new_text
             
             # Re-analyze the updated paragraph
-            from app.services.document_processor import DocumentProcessor
-            processor = DocumentProcessor(current_app)
-            updated_analysis = processor._analyze_single_paragraph(new_text, paragraph_id)
+            processor = current_app.extensions['doc_processor']
+            updated_analysis = await run_sync(processor.analyze_paragraph)(new_text, paragraph_id)
             results['paragraph_analyses'][paragraph_id].update(updated_analysis)
             
-            duration = (datetime.now() - start_time).total_seconds()
+            duration = time.perf_counter() - start_time
             
             DebugLogger.log_info("Paragraph updated successfully", {
                 "job_id": job_id,
@@ -107,7 +107,7 @@ def update_paragraph():
             return jsonify({'error': 'Invalid paragraph ID'}), 400
             
     except Exception as e:
-        duration = (datetime.now() - start_time).total_seconds()
+        duration = time.perf_counter() - start_time
         
         DebugLogger.log_error("Error updating paragraph", e, {
             "ip": request.remote_addr,
@@ -1,14 +1,16 @@
-from flask import Blueprint, jsonify, current_app
-from app.services.event_manager import EventManager
+import orjson
+from quart import Blueprint, Response, request, jsonify, current_app
 
 bp = Blueprint('status', __name__)
 
+MAX_BATCH_JOBS = 64
+
 @bp.route('/status/<job_id>', methods=['GET'])
-def get_processing_status(job_id):
+async def get_processing_status(job_id):
     """Get current processing status"""
     
     try:
-        event_manager = EventManager(current_app)
+        event_manager = current_app.extensions['event_manager']
         status = event_manager.get_status(job_id)
         
         return jsonify(status), 200
@@ -16,18 +18,56 @@ def get_processing_status(job_id):
     except Exception as e:
         return jsonify({'error': f'Failed to get status: {str(e)}'}), 500
 
+@bp.route('/status/batch', methods=['POST'])
+async def get_batch_status():
+    """Get processing status for several jobs in one request"""
+    
+    try:
+        data = await request.get_json(silent=True)
+        job_ids = data.get('jobs') if isinstance(data, dict) else None
+        
+        if not isinstance(job_ids, list) or not all(isinstance(i, str) for i in job_ids):
+            return jsonify({'error': 'Expected JSON body {"jobs": [job_id, ...]}'}), 400
+        
+        if len(job_ids) > MAX_BATCH_JOBS:
+            return jsonify({'error': f'Too many jobs (max {MAX_BATCH_JOBS})'}), 400
+        
+        event_manager = current_app.extensions['event_manager']
+        statuses = {job_id: event_manager.get_status(job_id) for job_id in job_ids}
+        
+        return jsonify(statuses), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to get status: {str(e)}'}), 500
+
 @bp.route('/analysis/<job_id>', methods=['GET'])
-def get_analysis_results(job_id):
+async def get_analysis_results(job_id):
     """Get analysis results for a specific job"""
     
     try:
-        event_manager = EventManager(current_app)
+        event_manager = current_app.extensions['event_manager']
         results = event_manager.get_results(job_id)
         
         if not results:
             return jsonify({'error': 'Analysis results not found'}), 404
         
+        if request.args.get('format') == 'ndjson':
+            return Response(
+                _iter_ndjson(results),
+                mimetype='application/x-ndjson',
+                headers={'X-Accel-Buffering': 'no'}
+            )
+        
         return jsonify(results), 200
         
     except Exception as e:
-        return jsonify({'error': f'Failed to retrieve results: {str(e)}'}), 500 
\ No newline at end of file
+        return jsonify({'error': f'Failed to retrieve results: {str(e)}'}), 500
+
+async def _iter_ndjson(results):
+    """Yield job metadata, then one line per paragraph analysis"""
+    
+    meta = {key: value for key, value in results.items() if key != 'paragraph_analyses'}
+    yield orjson.dumps(meta, option=orjson.OPT_NON_STR_KEYS) + b'\n'
+    
+    for paragraph in results.get('paragraph_analyses', []):
+        yield orjson.dumps(paragraph, option=orjson.OPT_NON_STR_KEYS) + b'\n' 
\ No newline at end of file
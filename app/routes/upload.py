@@ -1,23 +1,30 @@
 import os
+import time
 import uuid
-from flask import Blueprint, request, jsonify, current_app
+from quart import Blueprint, request, jsonify, current_app
+from werkzeug.exceptions import RequestEntityTooLarge
 from werkzeug.utils import secure_filename
-from app.services.event_manager import EventManager
 from app.services.debug_logger import DebugLogger
-from datetime import datetime
 
 bp = Blueprint('upload', __name__)
 
 ALLOWED_EXTENSIONS = {'docx'}
+ALLOWED_SUFFIXES = tuple(f'.{ext}' for ext in ALLOWED_EXTENSIONS)
+
+# .docx files are ZIP archives, which start with a local file header
+DOCX_MAGIC = b'PK\x03\x04'
+
+# Chunk size for writing uploads to disk
+UPLOAD_BUFFER_SIZE = 1024 * 1024
 
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return filename.lower().endswith(ALLOWED_SUFFIXES)
 
 @bp.route('/upload', methods=['POST'])
-def upload_document():
+async def upload_document():
     """Handle document upload and start processing"""
     
-    start_time = datetime.now()
+    start_time = time.perf_counter()
     
     try:
         # Log request
@@ -29,14 +36,25 @@ def upload_document():
             user_agent=request.headers.get('User-Agent')
         )
         
-        if 'file' not in request.files:
+        # Reject oversized uploads before reading the body
+        max_length = current_app.config['MAX_CONTENT_LENGTH']
+        if request.content_length and request.content_length > max_length:
+            DebugLogger.log_warning("Upload rejected: request too large", {
+                "ip": request.remote_addr,
+                "content_length": request.content_length,
+                "max_content_length": max_length
+            })
+            return jsonify({'error': f'File too large. Maximum size is {max_length} bytes.'}), 413
+        
+        files = await request.files
+        if 'file' not in files:
             DebugLogger.log_warning("Upload attempt with no file", {
                 "ip": request.remote_addr,
                 "user_agent": request.headers.get('User-Agent')
             })
             return jsonify({'error': 'No file provided'}), 400
         
-        file = request.files['file']
+        file = files['file']
         if file.filename == '':
             DebugLogger.log_warning("Upload attempt with empty filename", {
                 "ip": request.remote_addr
@@ -44,6 +62,16 @@ def upload_document():
             return jsonify({'error': 'No file selected'}), 400
         
         if file and allowed_file(file.filename):
+            # Check the content is a ZIP container before writing anything to disk
+            head = file.stream.read(len(DOCX_MAGIC))
+            file.stream.seek(0)
+            if head != DOCX_MAGIC:
+                DebugLogger.log_warning("Upload rejected: not a docx file", {
+                    "filename": file.filename,
+                    "ip": request.remote_addr
+                })
+                return jsonify({'error': 'Invalid file content. Only .docx files are allowed.'}), 400
+            
             # Generate unique job ID
             job_id = str(uuid.uuid4())
             
@@ -52,14 +80,11 @@ def upload_document():
             upload_folder = current_app.config['UPLOAD_FOLDER']
             file_path = os.path.join(upload_folder, f"{job_id}_{filename}")
             
-            # Ensure upload directory exists
-            os.makedirs(upload_folder, exist_ok=True)
-            
-            # Save file
-            file.save(file_path)
+            # Save file (async write in 1 MiB chunks, event loop stays free)
+            await file.save(file_path, buffer_size=UPLOAD_BUFFER_SIZE)
             
-            # Get file size
-            file_size = os.path.getsize(file_path)
+            # Stream was rewound before saving, so its position is the file size
+            file_size = file.stream.tell()
             
             DebugLogger.log_info("Document uploaded successfully", {
                 "job_id": job_id,
@@ -70,10 +95,10 @@ def upload_document():
             })
             
             # Start processing
-            event_manager = EventManager(current_app)
-            event_manager.start_document_processing(file_path, job_id)
+            event_manager = current_app.extensions['event_manager']
+            event_manager.start_document_processing(file_path, job_id, file_size)
             
-            duration = (datetime.now() - start_time).total_seconds()
+            duration = time.perf_counter() - start_time
             
             # Log successful upload
             DebugLogger.log_request(
@@ -97,8 +122,17 @@ def upload_document():
         })
         return jsonify({'error': 'Invalid file type. Only .docx files are allowed.'}), 400
         
+    except RequestEntityTooLarge:
+        # Body exceeded MAX_CONTENT_LENGTH while streaming (no Content-Length header)
+        max_length = current_app.config['MAX_CONTENT_LENGTH']
+        DebugLogger.log_warning("Upload rejected: request too large", {
+            "ip": request.remote_addr,
+            "max_content_length": max_length
+        })
+        return jsonify({'error': f'File too large. Maximum size is {max_length} bytes.'}), 413
+        
     except Exception as e:
-        duration = (datetime.now() - start_time).total_seconds()
+        duration = time.perf_counter() - start_time
         
         DebugLogger.log_error("Upload failed", e, {
             "ip": request.remote_addr,
@@ -1,5 +1,8 @@
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
 import sys
 from datetime import datetime
 from typing import Optional
@@ -17,34 +20,47 @@ class ColoredFormatter(logging.Formatter):
         'RESET': '\033[0m'        # Reset
     }
     
-    def format(self, record):
-        # Add color to the level name
-        levelname = record.levelname
-        if levelname in self.COLORS:
-            record.levelname = f"{self.COLORS[levelname]}{levelname}{self.COLORS['RESET']}"
-        
-        # Format the message
-        formatted = super().format(record)
-        
-        # Add emoji for different log levels
-        emoji_map = {
-            'DEBUG': '🔍',
-            'INFO': 'ℹ️',
-            'WARNING': '⚠️',
-            'ERROR': '❌',
-            'CRITICAL': '🚨'
-        }
+    # Emoji for different log levels
+    EMOJIS = {
+        'DEBUG': '🔍',
+        'INFO': 'ℹ️',
+        'WARNING': '⚠️',
+        'ERROR': '❌',
+        'CRITICAL': '🚨'
+    }
+    
+    def __init__(self, fmt=None, datefmt=None, stream=None):
+        super().__init__(fmt, datefmt)
+        
+        # Escape codes are noise when output goes to a file, pipe or log collector
+        stream = stream or sys.stdout
+        self._use_color = hasattr(stream, 'isatty') and stream.isatty()
         
-        emoji = emoji_map.get(levelname, '')
-        if emoji:
-            formatted = f"{emoji} {formatted}"
+        # Precomputed (colored level name, emoji prefix) per level
+        self._decor = {
+            level: (f"{color}{level}{self.COLORS['RESET']}", f"{self.EMOJIS[level]} ")
+            for level, color in self.COLORS.items() if level in self.EMOJIS
+        }
+    
+    def format(self, record):
+        decor = self._decor.get(record.levelname) if self._use_color else None
+        if decor is None:
+            return super().format(record)
         
-        return formatted
+        # Color the level name for this handler only; other handlers share the record
+        colored_level, emoji = decor
+        levelname = record.levelname
+        record.levelname = colored_level
+        try:
+            return emoji + super().format(record)
+        finally:
+            record.levelname = levelname
 
 class DebugLogger:
     """Enhanced logging system for MindDoc application"""
     
     _logger = None
+    _listener = None
     _initialized = False
     
     @classmethod
@@ -92,8 +108,14 @@ class DebugLogger:
             except:
                 pass
         
+        # File writes happen on a background listener thread; callers only enqueue
+        log_queue = queue.SimpleQueue()
+        cls._listener = logging.handlers.QueueListener(log_queue, file_handler, respect_handler_level=True)
+        cls._listener.start()
+        atexit.register(cls._listener.stop)
+        
         # Add handlers
-        cls._logger.addHandler(file_handler)
+        cls._logger.addHandler(logging.handlers.QueueHandler(log_queue))
         cls._logger.addHandler(console_handler)
         
         cls._initialized = True
@@ -103,100 +125,118 @@ class DebugLogger:
         cls.log_info(f"Log file: {os.path.abspath(log_file)}")
         cls.log_info(f"Log level: {log_level.upper()}")
     
+    @classmethod
+    def is_enabled_for(cls, level: int) -> bool:
+        """Check whether a message at level would be emitted, so callers can skip building context"""
+        return cls._logger is not None and cls._logger.isEnabledFor(level)
+    
     @classmethod
     def log_debug(cls, message: str, context: Optional[dict] = None):
         """Log debug message with optional context"""
         if context:
-            message = f"{message} | Context: {context}"
-        cls._logger.debug(message)
+            cls._logger.debug("%s | Context: %s", message, context)
+        else:
+            cls._logger.debug(message)
     
     @classmethod
     def log_info(cls, message: str, context: Optional[dict] = None):
         """Log info message with optional context"""
         if context:
-            message = f"{message} | Context: {context}"
-        cls._logger.info(message)
+            cls._logger.info("%s | Context: %s", message, context)
+        else:
+            cls._logger.info(message)
     
     @classmethod
     def log_warning(cls, message: str, context: Optional[dict] = None):
         """Log warning message with optional context"""
         if context:
-            message = f"{message} | Context: {context}"
-        cls._logger.warning(message)
+            cls._logger.warning("%s | Context: %s", message, context)
+        else:
+            cls._logger.warning(message)
     
     @classmethod
     def log_error(cls, message: str, exception: Optional[Exception] = None, context: Optional[dict] = None):
         """Log error message with optional exception and context"""
+        fmt = "%s"
+        args = [message]
         if exception:
-            message = f"{message} | Exception: {type(exception).__name__}: {str(exception)}"
+            fmt += " | Exception: %s: %s"
+            args += [type(exception).__name__, exception]
         if context:
-            message = f"{message} | Context: {context}"
-        cls._logger.error(message, exc_info=bool(exception))
+            fmt += " | Context: %s"
+            args.append(context)
+        cls._logger.error(fmt, *args, exc_info=exception)
     
     @classmethod
     def log_critical(cls, message: str, exception: Optional[Exception] = None, context: Optional[dict] = None):
         """Log critical message with optional exception and context"""
+        fmt = "%s"
+        args = [message]
         if exception:
-            message = f"{message} | Exception: {type(exception).__name__}: {str(exception)}"
+            fmt += " | Exception: %s: %s"
+            args += [type(exception).__name__, exception]
         if context:
-            message = f"{message} | Context: {context}"
-        cls._logger.critical(message, exc_info=bool(exception))
+            fmt += " | Context: %s"
+            args.append(context)
+        cls._logger.critical(fmt, *args, exc_info=exception)
     
     @classmethod
     def log_performance(cls, operation: str, duration: float, context: Optional[dict] = None):
         """Log performance metrics"""
-        message = f"Performance | {operation}: {duration:.3f}s"
         if context:
-            message = f"{message} | Context: {context}"
-        cls._logger.info(message)
+            cls._logger.info("Performance | %s: %.3fs | Context: %s", operation, duration, context)
+        else:
+            cls._logger.info("Performance | %s: %.3fs", operation, duration)
     
     @classmethod
     def log_request(cls, method: str, path: str, status_code: int, duration: float, user_agent: str = None):
         """Log HTTP request details"""
-        message = f"Request | {method} {path} | Status: {status_code} | Duration: {duration:.3f}s"
         if user_agent:
-            message = f"{message} | User-Agent: {user_agent}"
-        cls._logger.info(message)
+            cls._logger.info("Request | %s %s | Status: %s | Duration: %.3fs | User-Agent: %s",
+                             method, path, status_code, duration, user_agent)
+        else:
+            cls._logger.info("Request | %s %s | Status: %s | Duration: %.3fs",
+                             method, path, status_code, duration)
     
     @classmethod
     def log_document_processing(cls, job_id: str, action: str, details: Optional[dict] = None):
         """Log document processing events"""
-        message = f"Document Processing | Job: {job_id} | Action: {action}"
         if details:
-            message = f"{message} | Details: {details}"
-        cls._logger.info(message)
+            cls._logger.info("Document Processing | Job: %s | Action: %s | Details: %s", job_id, action, details)
+        else:
+            cls._logger.info("Document Processing | Job: %s | Action: %s", job_id, action)
     
     @classmethod
     def log_api_call(cls, service: str, endpoint: str, status: str, duration: float = None):
         """Log API calls"""
-        message = f"API Call | {service} | {endpoint} | Status: {status}"
         if duration:
-            message = f"{message} | Duration: {duration:.3f}s"
-        cls._logger.info(message)
+            cls._logger.info("API Call | %s | %s | Status: %s | Duration: %.3fs", service, endpoint, status, duration)
+        else:
+            cls._logger.info("API Call | %s | %s | Status: %s", service, endpoint, status)
     
     @classmethod
     def log_security(cls, event: str, details: Optional[dict] = None):
         """Log security-related events"""
-        message = f"Security | {event}"
         if details:
-            message = f"{message} | Details: {details}"
-        cls._logger.warning(message)
+            cls._logger.warning("Security | %s | Details: %s", event, details)
+        else:
+            cls._logger.warning("Security | %s", event)
     
     @classmethod
     def log_user_action(cls, user_id: str, action: str, details: Optional[dict] = None):
         """Log user actions"""
-        message = f"User Action | User: {user_id} | Action: {action}"
         if details:
-            message = f"{message} | Details: {details}"
-        cls._logger.info(message)
+            cls._logger.info("User Action | User: %s | Action: %s | Details: %s", user_id, action, details)
+        else:
+            cls._logger.info("User Action | User: %s | Action: %s", user_id, action)
     
     @classmethod
     def log_system_health(cls, component: str, status: str, details: Optional[dict] = None):
         """Log system health information"""
-        message = f"System Health | {component} | Status: {status}"
         if details:
-            message = f"{message} | Details: {details}"
-        cls._logger.info(message)
+            cls._logger.info("System Health | %s | Status: %s | Details: %s", component, status, details)
+        else:
+            cls._logger.info("System Health | %s | Status: %s", component, status)
     
     @classmethod
     def get_log_file_path(cls) -> str:
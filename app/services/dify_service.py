@@ -1,13 +1,42 @@
-import requests
-from typing import Dict, Any
+import asyncio
+import logging
+import re
+import time
+import aiohttp
+import orjson
+from typing import Dict, Any, Optional
 from app.services.debug_logger import DebugLogger
-from datetime import datetime
+
+# Bullet lines ("- ..." or "• ...") in the Dify answer; whitespace never spans lines
+SUGGESTION_RE = re.compile(r'^[^\S\n]*[-•][^\S\n]*(.*?)[^\S\n]*$', re.MULTILINE)
+
+# Transient gateway errors and dropped connections are retried with exponential backoff
+RETRY_STATUSES = {502, 503, 504}
+MAX_RETRIES = 2
+RETRY_BACKOFF = 0.2
+
+# Prompt sent to Dify for each paragraph
+PARAGRAPH_PROMPT = """
+            Analyze the following paragraph and provide improvement suggestions:
+            
+            Paragraph:
+            {text}
+            
+            Please provide:
+            1. Writing style recommendations
+            2. Grammar and clarity improvements
+            3. Content suggestions
+            
+            List each suggestion on its own line starting with "- ".
+            """
 
 class DifyService:
     def __init__(self, app):
         self.app = app
         self.api_key = app.config.get('DIFY_API_KEY')
         self.api_url = app.config.get('DIFY_API_URL', 'https://api.dify.ai/v1')
+        self.concurrency = app.config.get('DIFY_CONCURRENCY', 8)
+        self._session: Optional[aiohttp.ClientSession] = None
         
         if not self.api_key:
             DebugLogger.log_warning("Dify API key not configured", {
@@ -27,8 +56,23 @@ class DifyService:
                 "api_url": self.api_url
             })
     
-    def analyze_document_with_dify(self, document_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Send document analysis request to Dify API"""
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Lazily create the pooled keep-alive aiohttp session on the running event loop"""
+        
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=max(16, self.concurrency), keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(connector=connector, headers=self.headers)
+        return self._session
+    
+    async def close(self) -> None:
+        """Close the aiohttp session if one was opened"""
+        
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def analyze_document_with_dify(self, document_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Send each paragraph to Dify concurrently and collect the suggestions in order"""
         
         if not self.headers:
             DebugLogger.log_warning("Cannot analyze with Dify: API key not configured", {
@@ -41,97 +85,143 @@ class DifyService:
                 'suggestions': []
             }
         
-        start_time = datetime.now()
+        start_time = time.perf_counter()
+        paragraphs = document_data.get('paragraph_analyses', [])
+        
+        DebugLogger.log_api_call("Dify", "/chat-messages", "started")
+        DebugLogger.log_debug("Sending paragraphs to Dify API", {
+            "service": "Dify",
+            "endpoint": "/chat-messages",
+            "paragraphs": len(paragraphs),
+            "concurrency": self.concurrency
+        })
+        
+        session = await self._get_session()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        # gather() keeps results in paragraph order
+        paragraph_results = await asyncio.gather(*[
+            self._analyze_one(session, semaphore, p['text'], p['paragraph_index'])
+            for p in paragraphs
+        ])
+        
+        duration = time.perf_counter() - start_time
+        failed = [r for r in paragraph_results if 'error' in r]
+        
+        result = {
+            'suggestions': [s for r in paragraph_results for s in r['suggestions']],
+            'paragraph_suggestions': paragraph_results
+        }
+        
+        if failed and len(failed) == len(paragraph_results):
+            result['error'] = failed[0]['error']
+            DebugLogger.log_api_call("Dify", "/chat-messages", "failed", duration)
+            return result
+        
+        DebugLogger.log_api_call("Dify", "/chat-messages", "success", duration)
+        DebugLogger.log_info("✅ Dify API analysis completed successfully", {
+            "duration": duration,
+            "paragraphs": len(paragraph_results),
+            "failed_paragraphs": len(failed),
+            "suggestions_count": len(result['suggestions'])
+        })
+        return result
+    
+    async def _analyze_one(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                           text: str, index: int) -> Dict[str, Any]:
+        """Send a single paragraph to Dify, returning its suggestions or an error"""
+        
+        start_time = time.perf_counter()
         
         try:
-            DebugLogger.log_api_call("Dify", "/chat-messages", "started")
-            
-            # Prepare payload
-            paragraphs = document_data.get('paragraph_analyses', [])
-            text_content = "\n\n".join([p['text'] for p in paragraphs])
-            
-            prompt = f"""
-            Analyze the following document and provide improvement suggestions:
-            
-            Document Content:
-            {text_content}
-            
-            Please provide:
-            1. Overall document assessment
-            2. Specific improvement suggestions for each paragraph
-            3. Writing style recommendations
-            4. Content structure suggestions
-            5. Grammar and clarity improvements
-            """
-            
-            payload = {
+            payload = orjson.dumps({
                 'inputs': {},
-                'query': prompt,
+                'query': PARAGRAPH_PROMPT.format(text=text),
                 'response_mode': 'blocking',
                 'conversation_id': '',
                 'user': 'minddoc_user'
-            }
-            
-            DebugLogger.log_debug("Sending request to Dify API", {
-                "service": "Dify",
-                "endpoint": "/chat-messages",
-                "payload_size": len(str(payload)),
-                "text_length": len(text_content),
-                "paragraphs": len(paragraphs)
             })
             
-            # Make API call
-            response = requests.post(
-                f"{self.api_url}/chat-messages",
-                headers=self.headers,
-                json=payload,
-                timeout=60
-            )
+            async with semaphore:
+                body = await self._post_chat_message(session, payload)
             
-            duration = (datetime.now() - start_time).total_seconds()
+            result = self._process_dify_response(orjson.loads(body))
             
-            if response.status_code == 200:
-                result = self._process_dify_response(response.json())
-                DebugLogger.log_api_call("Dify", "/chat-messages", "success", duration)
-                DebugLogger.log_info("✅ Dify API analysis completed successfully", {
-                    "duration": duration,
-                    "suggestions_count": len(result.get('suggestions', [])),
-                    "response_size": len(str(response.json()))
+            if DebugLogger.is_enabled_for(logging.DEBUG):
+                DebugLogger.log_debug(f"Dify analysis for paragraph {index} completed", {
+                    "paragraph_index": index,
+                    "duration": time.perf_counter() - start_time,
+                    "payload_size": len(payload),
+                    "response_size": len(body),
+                    "suggestions_count": len(result['suggestions'])
                 })
-                return result
-            else:
-                raise Exception(f"Dify API error: {response.status_code} - {response.text}")
+            
+            return {'paragraph_index': index, **result}
                 
-        except requests.exceptions.Timeout:
+        except asyncio.TimeoutError:
             DebugLogger.log_error("Dify API request timed out", context={
                 "service": "Dify",
+                "paragraph_index": index,
                 "timeout": 60,
-                "duration": (datetime.now() - start_time).total_seconds()
+                "duration": time.perf_counter() - start_time
             })
             return {
+                'paragraph_index': index,
                 'error': 'API request timed out',
                 'suggestions': []
             }
-        except requests.exceptions.RequestException as e:
+        except aiohttp.ClientError as e:
             DebugLogger.log_error(f"Dify API network error", e, {
                 "service": "Dify",
+                "paragraph_index": index,
                 "api_url": self.api_url,
-                "duration": (datetime.now() - start_time).total_seconds()
+                "duration": time.perf_counter() - start_time
             })
             return {
+                'paragraph_index': index,
                 'error': f'Network error: {str(e)}',
                 'suggestions': []
             }
         except Exception as e:
             DebugLogger.log_error("Dify API analysis failed", e, {
                 "service": "Dify",
-                "duration": (datetime.now() - start_time).total_seconds()
+                "paragraph_index": index,
+                "duration": time.perf_counter() - start_time
             })
             return {
+                'paragraph_index': index,
                 'error': str(e),
                 'suggestions': []
             }
     
+    async def _post_chat_message(self, session: aiohttp.ClientSession, payload: bytes) -> bytes:
+        """POST to /chat-messages, retrying transient gateway and connection errors"""
+        
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                async with session.post(
+                    f"{self.api_url}/chat-messages",
+                    data=payload,
+                    timeout=aiohttp.ClientTimeout(total=60)
+                ) as response:
+                    if response.status == 200:
+                        return await response.read()
+                    if response.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                        raise Exception(f"Dify API error: {response.status} - {await response.text()}")
+                    reason = {"status_code": response.status}
+            except aiohttp.ClientConnectionError as e:
+                # Stale pooled keep-alive connections surface here; a fresh one usually succeeds
+                if attempt == MAX_RETRIES:
+                    raise
+                reason = {"error": f"{type(e).__name__}: {e}"}
+            
+            DebugLogger.log_warning("Retrying Dify API request", {
+                "service": "Dify",
+                **reason,
+                "attempt": attempt + 1
+            })
+            await asyncio.sleep(RETRY_BACKOFF * (2 ** attempt))
+    
     def _process_dify_response(self, response: Dict[str, Any]) -> Dict[str, Any]:
         """Process Dify API response"""
         
@@ -139,21 +229,14 @@ class DifyService:
             answer = response.get('answer', '')
             
             # Parse suggestions (simplified)
-            suggestions = []
-            lines = answer.split('\n')
-            
-            for line in lines:
-                line = line.strip()
-                if line.startswith('-') or line.startswith('•'):
-                    suggestion = line[1:].strip()
-                    if suggestion:
-                        suggestions.append(suggestion)
+            suggestions = [m.group(1) for m in SUGGESTION_RE.finditer(answer) if m.group(1)]
             
-            DebugLogger.log_debug("Dify response processed", {
-                "raw_response_length": len(answer),
-                "suggestions_extracted": len(suggestions),
-                "response_lines": len(lines)
-            })
+            if DebugLogger.is_enabled_for(logging.DEBUG):
+                DebugLogger.log_debug("Dify response processed", {
+                    "raw_response_length": len(answer),
+                    "suggestions_extracted": len(suggestions),
+                    "response_lines": answer.count('\n') + 1
+                })
             
             return {
                 'suggestions': suggestions,
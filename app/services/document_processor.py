@@ -1,30 +1,75 @@
-from docx import Document
-import spacy
-import textstat
-from typing import Dict, List, Any
+import logging
+import os
+import time
+from typing import Dict, List, Any, Iterator, Optional, Tuple
 from datetime import datetime
 from app.services.debug_logger import DebugLogger
+from app.services.job_cache import JobCache
+
+# Paragraphs per spaCy batch
+PIPE_BATCH_SIZE = 64
+
+# Pipeline components whose output the analysis never reads (only ents and dep are used,
+# so tok2vec, parser and ner stay)
+UNUSED_COMPONENTS = ["tagger", "attribute_ruler", "lemmatizer"]
+
+def _count_matches(values, target):
+    """Count entries of a token attribute array equal to target (Numba kernel)"""
+    count = 0
+    for value in values:
+        if value == target:
+            count += 1
+    return count
+
+def _load_match_counter():
+    """Compile _count_matches with Numba when available, else fall back to a NumPy compare"""
+    import numpy as np
+    try:
+        from numba import njit
+    except ImportError:
+        return lambda values, target: int((values == target).sum())
+    counter = njit(cache=True)(_count_matches)
+    # Warm-up compile for the uint64 arrays Doc.to_array returns, off the request path
+    counter(np.zeros(1, dtype=np.uint64), np.uint64(0))
+    return counter
 
 class DocumentProcessor:
     def __init__(self, app):
         self.app = app
+        self._paragraph_cache = JobCache(maxsize=app.config.get('PARAGRAPH_CACHE_SIZE', 2048))
+        # spaCy, python-docx and textstat are imported here rather than at module level
+        # so importing the app (scripts, route tests) doesn't pay for them
+        import numpy as np
+        import spacy
+        import textstat
+        from docx import Document
+        from docx.text.paragraph import Paragraph
+        from spacy.attrs import DEP
+        self._Document = Document
+        self._Paragraph = Paragraph
+        self._textstat = textstat
+        self._dep_attr = DEP
+        self._count_matches = _load_match_counter()
         try:
-            self.nlp = spacy.load("en_core_web_sm")
+            self.nlp = spacy.load("en_core_web_sm", exclude=UNUSED_COMPONENTS)
             DebugLogger.log_info("✅ spaCy model loaded successfully", {
                 "model": "en_core_web_sm",
+                "pipeline": self.nlp.pipe_names,
                 "status": "ready"
             })
+            # Integer id of the passive subject label, compared against the DEP array
+            self._nsubjpass_id = np.uint64(self.nlp.vocab.strings["nsubjpass"])
         except OSError:
             DebugLogger.log_error("spaCy model 'en_core_web_sm' not found. Please run: python -m spacy download en_core_web_sm")
             raise RuntimeError("spaCy model not loaded. Please install the required model.")
     
-    def process_document(self, file_path: str, job_id: str) -> Dict[str, Any]:
+    def process_document(self, file_path: str, job_id: str, file_size: Optional[int] = None) -> Dict[str, Any]:
         """Main document processing pipeline"""
         
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         DebugLogger.log_document_processing(job_id, "started", {
             "file_path": file_path,
-            "file_size": self._get_file_size(file_path)
+            "file_size": file_size if file_size is not None else self._get_file_size(file_path)
         })
         
         try:
@@ -37,7 +82,7 @@ class DocumentProcessor:
             # Generate overall analysis
             overall_analysis = self._generate_overall_analysis(paragraph_analyses)
             
-            # Store results
+            # Caller adds the Dify analysis and stores the final results once
             results = {
                 'job_id': job_id,
                 'file_path': file_path,
@@ -47,11 +92,10 @@ class DocumentProcessor:
                 'created_at': datetime.now().isoformat()
             }
             
-            self.app.analysis_results[job_id] = results
-            self._update_status(job_id, "completed", "Analysis completed")
+            self._update_status(job_id, "processing", "Paragraph analysis completed, running AI analysis...")
             
             # Log performance
-            duration = (datetime.now() - start_time).total_seconds()
+            duration = time.perf_counter() - start_time
             DebugLogger.log_performance("Document processing", duration, {
                 "job_id": job_id,
                 "paragraphs_analyzed": len(paragraph_analyses),
@@ -78,22 +122,28 @@ class DocumentProcessor:
         """Analyze each paragraph"""
         
         try:
-            doc = Document(file_path)
-            analyses = []
-            
             DebugLogger.log_debug("Starting paragraph analysis", {
-                "file_path": file_path,
-                "total_paragraphs": len(doc.paragraphs)
+                "file_path": file_path
             })
             
-            for i, paragraph in enumerate(doc.paragraphs):
-                if paragraph.text.strip():
-                    analysis = self._analyze_single_paragraph(paragraph.text, i)
-                    analyses.append(analysis)
+            # Paragraph texts stream straight into spaCy; the original index rides along as context
+            counts = {'total': 0}
+            # Always in-process: this runs on an EventManager pool thread, and forking spaCy
+            # workers from a multi-threaded process is unsafe
+            docs_nlp = self.nlp.pipe(
+                self._iter_paragraph_texts(file_path, counts),
+                as_tuples=True,
+                batch_size=PIPE_BATCH_SIZE,
+                n_process=1
+            )
+            analyses = [
+                self._finalize_analysis(doc_nlp, doc_nlp.text, index)
+                for doc_nlp, index in docs_nlp
+            ]
             
             DebugLogger.log_info(f"Paragraph analysis completed", {
                 "paragraphs_analyzed": len(analyses),
-                "total_paragraphs": len(doc.paragraphs)
+                "total_paragraphs": counts['total']
             })
             
             return analyses
@@ -103,33 +153,72 @@ class DocumentProcessor:
             })
             raise
     
-    def _analyze_single_paragraph(self, text: str, index: int) -> Dict[str, Any]:
-        """Analyze a single paragraph"""
+    def _iter_paragraph_texts(self, file_path: str, counts: Dict[str, int]) -> Iterator[Tuple[str, int]]:
+        """Yield (text, index) for non-empty body paragraphs, counting every paragraph in counts"""
+        
+        doc = self._Document(file_path)
+        paragraphs = (item for item in doc.iter_inner_content() if isinstance(item, self._Paragraph))
+        
+        for index, paragraph in enumerate(paragraphs):
+            counts['total'] += 1
+            text = paragraph.text
+            if text.strip():
+                yield text, index
+    
+    def analyze_paragraph(self, text: str, index: int) -> Dict[str, Any]:
+        """Analyze an edited paragraph, reusing the result for repeated (text, index) pairs"""
+        
+        key = (text, index)
+        analysis = self._paragraph_cache.get(key)
+        if analysis is None:
+            try:
+                analysis = self._build_analysis(self.nlp(text), text, index)
+            except Exception as e:
+                # Failures aren't cached, so a transient error isn't served for this text forever
+                return self._fallback_analysis(text, index, e)
+            self._paragraph_cache[key] = analysis
+        
+        # Callers merge the result into job state, so hand out a copy that shares no lists
+        return {**analysis, 'entities': list(analysis['entities']), 'comments': list(analysis['comments'])}
+    
+    def _finalize_analysis(self, doc_nlp, text: str, index: int) -> Dict[str, Any]:
+        """Build the analysis for a paragraph from its parsed spaCy Doc, falling back on errors"""
         
         try:
-            doc_nlp = self.nlp(text)
-            
-            analysis = {
-                'paragraph_index': index,
-                'text': text,
-                'word_count': len(text.split()),
-                'readability': textstat.flesch_reading_ease(text),
-                'entities': [(ent.text, ent.label_) for ent in doc_nlp.ents],
-                'comments': []
-            }
-            
-            # Generate comments
-            if analysis['word_count'] < 10:
-                analysis['comments'].append("This paragraph is quite short. Consider adding more detail.")
-            
-            if analysis['readability'] < 30:
-                analysis['comments'].append("This paragraph is difficult to read. Consider simplifying the language.")
-            
-            # Check for passive voice
-            passive_count = sum(1 for token in doc_nlp if token.dep_ == "nsubjpass")
-            if passive_count > 0:
-                analysis['comments'].append(f"Consider using active voice instead of passive voice ({passive_count} instances).")
-            
+            return self._build_analysis(doc_nlp, text, index)
+        except Exception as e:
+            return self._fallback_analysis(text, index, e)
+    
+    def _build_analysis(self, doc_nlp, text: str, index: int) -> Dict[str, Any]:
+        """Build the analysis for a paragraph from its parsed spaCy Doc"""
+        
+        # Entities and passive subjects in one block; passive count runs over the DEP array
+        entities = [(ent.text, ent.label_) for ent in doc_nlp.ents]
+        passive_count = int(self._count_matches(doc_nlp.to_array(self._dep_attr), self._nsubjpass_id))
+        # Whitespace-separated words counted from spaCy's tokens; readability reuses the count
+        word_count = self._count_words(doc_nlp)
+        
+        analysis = {
+            'paragraph_index': index,
+            'text': text,
+            'word_count': word_count,
+            'readability': self._flesch_from_doc(doc_nlp, text, word_count),
+            'entities': entities,
+            'comments': []
+        }
+        
+        # Generate comments
+        if analysis['word_count'] < 10:
+            analysis['comments'].append("This paragraph is quite short. Consider adding more detail.")
+        
+        if analysis['readability'] < 30:
+            analysis['comments'].append("This paragraph is difficult to read. Consider simplifying the language.")
+        
+        # Check for passive voice
+        if passive_count > 0:
+            analysis['comments'].append(f"Consider using active voice instead of passive voice ({passive_count} instances).")
+        
+        if DebugLogger.is_enabled_for(logging.DEBUG):
             DebugLogger.log_debug(f"Paragraph {index} analyzed", {
                 "paragraph_index": index,
                 "word_count": analysis['word_count'],
@@ -137,30 +226,60 @@ class DocumentProcessor:
                 "entities_found": len(analysis['entities']),
                 "comments_generated": len(analysis['comments'])
             })
-            
-            return analysis
-        except Exception as e:
-            DebugLogger.log_error(f"Error analyzing paragraph {index}", e, {
-                "paragraph_index": index,
-                "text_length": len(text)
-            })
-            # Return basic analysis without NLP features
-            return {
-                'paragraph_index': index,
-                'text': text,
-                'word_count': len(text.split()),
-                'readability': 0,
-                'entities': [],
-                'comments': ["Error analyzing this paragraph"]
-            }
+        
+        return analysis
+    
+    def _flesch_from_doc(self, doc_nlp, text: str, n_words: int) -> float:
+        """Flesch reading ease from a _count_words word count and the parsed Doc's sentences"""
+        
+        if not n_words:
+            return self._textstat.flesch_reading_ease(text)
+        n_sentences = max(1, sum(1 for _ in doc_nlp.sents))
+        n_syllables = self._textstat.syllable_count(text)
+        return 206.835 - 1.015 * (n_words / n_sentences) - 84.6 * (n_syllables / n_words)
+    
+    @staticmethod
+    def _count_words(doc_nlp) -> int:
+        """Count whitespace-separated words the way textstat does: clitics ("n't", "'s") and
+        hyphenated parts belong to the word they are attached to, punctuation alone is not a word"""
+        
+        count = 0
+        in_word = False
+        for token in doc_nlp:
+            if not in_word and not (token.is_punct or token.is_space):
+                count += 1
+                in_word = True
+            if token.whitespace_ or token.is_space:
+                in_word = False
+        return count
+    
+    def _fallback_analysis(self, text: str, index: int, error: Exception) -> Dict[str, Any]:
+        """Log a paragraph analysis failure and return basic analysis without NLP features"""
+        
+        DebugLogger.log_error(f"Error analyzing paragraph {index}", error, {
+            "paragraph_index": index,
+            "text_length": len(text)
+        })
+        return {
+            'paragraph_index': index,
+            'text': text,
+            'word_count': text.count(' ') + 1,
+            'readability': 0,
+            'entities': [],
+            'comments': ["Error analyzing this paragraph"]
+        }
     
     def _generate_overall_analysis(self, paragraph_analyses: List[Dict[str, Any]]) -> Dict[str, Any]:
         """Generate overall document analysis"""
         
         try:
-            total_words = sum(p['word_count'] for p in paragraph_analyses)
-            avg_readability = sum(p['readability'] for p in paragraph_analyses) / len(paragraph_analyses) if paragraph_analyses else 0
-            total_entities = sum(len(p['entities']) for p in paragraph_analyses)
+            # Single pass over the paragraphs
+            total_words = total_readability = total_entities = 0
+            for p in paragraph_analyses:
+                total_words += p['word_count']
+                total_readability += p['readability']
+                total_entities += len(p['entities'])
+            avg_readability = total_readability / len(paragraph_analyses) if paragraph_analyses else 0
             
             analysis = {
                 'total_paragraphs': len(paragraph_analyses),
@@ -189,24 +308,13 @@ class DocumentProcessor:
             }
     
     def _update_status(self, job_id: str, status: str, message: str) -> None:
-        """Update processing status"""
-        
-        self.app.processing_status[job_id] = {
-            'status': status,
-            'message': message,
-            'timestamp': datetime.now().isoformat()
-        }
+        """Update processing status through the EventManager, which owns the status format"""
         
-        DebugLogger.log_debug(f"Status updated for job {job_id}", {
-            "job_id": job_id,
-            "status": status,
-            "message": message
-        })
+        self.app.extensions['event_manager'].update_status(job_id, status, message)
     
     def _get_file_size(self, file_path: str) -> int:
         """Get file size in bytes"""
         try:
-            import os
-            return os.path.getsize(file_path)
-        except Exception:
+            return os.stat(file_path).st_size
+        except OSError:
             return 0 
\ No newline at end of file
@@ -1,29 +1,46 @@
-import threading
+import asyncio
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 from app.services.debug_logger import DebugLogger
 
 class EventManager:
     def __init__(self, app):
         self.app = app
-        self.processing_threads = {}
+        
+        # Bounded pool for CPU-bound document processing; extra jobs queue instead of spawning threads
+        self._executor = ThreadPoolExecutor(
+            max_workers=app.config.get('PROCESSING_WORKERS', 4),
+            thread_name_prefix='minddoc-processing'
+        )
     
-    def start_document_processing(self, file_path: str, job_id: str) -> None:
-        """Start document processing in background thread"""
+    def start_document_processing(self, file_path: str, job_id: str, file_size: Optional[int] = None) -> None:
+        """Start document processing as an app background task"""
         
-        def process_document():
+        async def process_document():
             try:
-                from app.services.document_processor import DocumentProcessor
-                from app.services.dify_service import DifyService
-                
-                processor = DocumentProcessor(self.app)
-                dify_service = DifyService(self.app)
+                processor = self.app.extensions['doc_processor']
+                dify_service = self.app.extensions['dify_service']
                 
-                # Process document
-                results = processor.process_document(file_path, job_id)
+                # Process document (CPU-bound, runs on the processing pool)
+                loop = asyncio.get_running_loop()
+                results = await loop.run_in_executor(self._executor, processor.process_document, file_path, job_id, file_size)
                 
-                # Send to Dify for additional analysis
-                dify_results = dify_service.analyze_document_with_dify(results)
+                # Send to Dify for additional analysis; past the timeout the spaCy results ship without it
+                timeout = self.app.config.get('PROCESSING_TIMEOUT', 300)
+                try:
+                    dify_results = await asyncio.wait_for(dify_service.analyze_document_with_dify(results), timeout)
+                except asyncio.TimeoutError:
+                    DebugLogger.log_warning(f"Dify analysis timed out for job {job_id}", {
+                        "job_id": job_id,
+                        "timeout": timeout
+                    })
+                    dify_results = {
+                        'error': f'Dify analysis timed out after {timeout}s',
+                        'suggestions': []
+                    }
                 
                 # Combine results
                 combined_results = {
@@ -31,38 +48,56 @@ class EventManager:
                     'dify_analysis': dify_results
                 }
                 
-                # Store final results
+                # Store final results, then mark the job complete so readers never see partial results
                 self.app.analysis_results[job_id] = combined_results
+                self.update_status(job_id, "completed", "Analysis completed")
                 
                 DebugLogger.log_info(f"Document processing completed for job {job_id}")
                 
             except Exception as e:
                 DebugLogger.log_error(f"Document processing failed for job {job_id}", e)
-                self._update_status(job_id, "failed", f"Processing failed: {str(e)}")
+                self.update_status(job_id, "failed", f"Processing failed: {str(e)}")
         
-        # Start processing in background thread
-        thread = threading.Thread(target=process_document)
-        thread.daemon = True
-        thread.start()
+        # Schedule processing without blocking the request
+        self.app.add_background_task(process_document)
+    
+    def shutdown(self) -> None:
+        """Stop accepting work on the processing pool"""
         
-        self.processing_threads[job_id] = thread
+        self._executor.shutdown(wait=False, cancel_futures=True)
     
-    def _update_status(self, job_id: str, status: str, message: str) -> None:
-        """Update processing status"""
+    def update_status(self, job_id: str, status: str, message: str) -> None:
+        """Update processing status (the single writer of processing_status entries)"""
         
+        # Raw epoch seconds; formatted only when a client reads the status in get_status
         self.app.processing_status[job_id] = {
             'status': status,
             'message': message,
-            'timestamp': datetime.now().isoformat()
+            'ts': time.time()
         }
+        
+        if DebugLogger.is_enabled_for(logging.DEBUG):
+            DebugLogger.log_debug(f"Status updated for job {job_id}", {
+                "job_id": job_id,
+                "status": status,
+                "message": message
+            })
     
     def get_status(self, job_id: str) -> Dict[str, Any]:
         """Get current processing status"""
         
-        return self.app.processing_status.get(job_id, {
-            'status': 'unknown',
-            'message': 'Job not found'
-        })
+        status = self.app.processing_status.get(job_id)
+        if status is None:
+            return {
+                'status': 'unknown',
+                'message': 'Job not found'
+            }
+        
+        return {
+            'status': status['status'],
+            'message': status['message'],
+            'timestamp': datetime.fromtimestamp(status['ts']).isoformat()
+        }
     
     def get_results(self, job_id: str) -> Dict[str, Any]:
         """Get analysis results"""
@@ -0,0 +1,33 @@
+import threading
+from cachetools import LRUCache
+
+class JobCache(LRUCache):
+    """Bounded LRU store for per-job state shared by request handlers and worker threads"""
+    
+    def __init__(self, maxsize: int):
+        super().__init__(maxsize=maxsize)
+        self._lock = threading.RLock()
+    
+    def __getitem__(self, key):
+        with self._lock:
+            return super().__getitem__(key)
+    
+    def __setitem__(self, key, value):
+        with self._lock:
+            super().__setitem__(key, value)
+    
+    def __delitem__(self, key):
+        with self._lock:
+            super().__delitem__(key)
+    
+    def get(self, key, default=None):
+        with self._lock:
+            return super().get(key, default)
+    
+    def pop(self, key, *args):
+        with self._lock:
+            return super().pop(key, *args)
+    
+    def setdefault(self, key, default=None):
+        with self._lock:
+            return super().setdefault(key, default) 
\ No newline at end of file
@@ -13,9 +13,9 @@ def test_imports():
     
     try:
         from app import create_app
-        print("✅ Flask app import successful")
+        print("✅ Quart app import successful")
     except ImportError as e:
-        print(f"❌ Flask app import failed: {e}")
+        print(f"❌ Quart app import failed: {e}")
         return False
     
     try:
@@ -58,16 +58,16 @@ def test_config():
     return True
 
 def test_app_creation():
-    """Test if the Flask app can be created"""
+    """Test if the Quart app can be created"""
     print("\nTesting app creation...")
     
     try:
         from app import create_app
         app = create_app()
-        print("✅ Flask app created successfully")
+        print("✅ Quart app created successfully")
         return True
     except Exception as e:
-        print(f"❌ Flask app creation failed: {e}")
+        print(f"❌ Quart app creation failed: {e}")
         return False
 
 def test_spacy():
@@ -23,6 +23,7 @@ def test_routes():
         test_main_page,
         test_upload_route,
         test_status_route,
+        test_batch_status_route,
         test_api_route
     ]
     
@@ -89,6 +90,28 @@ def test_status_route(base_url):
         print(f"❌ Status route failed: {response.status_code}")
         return False
 
+def test_batch_status_route(base_url):
+    """Test the batch status route"""
+    print("Testing batch status route...")
+    
+    response = requests.post(
+        f"{base_url}/status/batch",
+        json={'jobs': ['invalid-job-id']},
+        timeout=5
+    )
+    
+    if response.status_code == 200:
+        data = response.json()
+        if data.get('invalid-job-id', {}).get('status') == 'unknown':
+            print("✅ Batch status route handles invalid job IDs correctly")
+            return True
+        else:
+            print("❌ Batch status route unexpected response format")
+            return False
+    else:
+        print(f"❌ Batch status route failed: {response.status_code}")
+        return False
+
 def test_api_route(base_url):
     """Test the API route"""
     print("Testing API route...")
@@ -5,6 +5,7 @@ Simple log viewer utility for MindDoc application
 
 import os
 import sys
+from collections import Counter
 from datetime import datetime
 from app.services.debug_logger import DebugLogger
 
@@ -36,21 +37,18 @@ def view_log_stats():
         return
     
     try:
-        with open(log_file, 'r') as f:
-            lines = f.readlines()
+        # Stream the file in binary; only the level field of each line is decoded
+        total_lines = 0
+        level_counts = Counter()
+        with open(log_file, 'rb', buffering=1 << 20) as f:
+            for raw in f:
+                total_lines += 1
+                parts = raw.split(b'|', 3)
+                if len(parts) >= 3:
+                    level_counts[parts[2].strip()] += 1
         
-        total_lines = len(lines)
         file_size = os.path.getsize(log_file)
         
-        # Count log levels
-        level_counts = {}
-        for line in lines:
-            if '|' in line:
-                parts = line.split('|')
-                if len(parts) >= 3:
-                    level = parts[2].strip()
-                    level_counts[level] = level_counts.get(level, 0) + 1
-        
         print(f"📁 Log File: {log_file}")
         print(f"📏 File Size: {file_size:,} bytes")
         print(f"📄 Total Lines: {total_lines:,}")
@@ -59,7 +57,7 @@ def view_log_stats():
         print("\n📈 Log Level Distribution:")
         for level, count in sorted(level_counts.items()):
             percentage = (count / total_lines) * 100
-            print(f"   {level}: {count:,} ({percentage:.1f}%)")
+            print(f"   {level.decode(errors='replace')}: {count:,} ({percentage:.1f}%)")
         
     except Exception as e:
         print(f"❌ Error reading log file: {e}")